@@ -2,6 +2,9 @@ from google import genai
 from google.genai import types
 import os
 import json
+import random
+import threading
+import time
 import requests
 from dotenv import load_dotenv
 from datetime import datetime, timezone
@@ -13,6 +16,24 @@ gemini_api_key = os.getenv('GEMINI_API_KEY')
 pplx_api_key = os.getenv('PPLX_API_KEY')
 gemini_client = genai.Client(api_key=gemini_api_key)
 
+# One pooled session keeps the Perplexity TLS connection alive between posts
+pplx_session = requests.Session()
+pplx_session.headers.update({
+    'Authorization': f'Bearer {pplx_api_key}',
+    'Content-Type': 'application/json'
+})
+
+# Client-side throttle for Gemini: cap requests in flight, space out their starts,
+# and back off every caller together when the API answers 429
+GEMINI_MAX_CONCURRENT = 2
+GEMINI_MIN_INTERVAL_SECONDS = 1.0
+GEMINI_MAX_RETRIES = 3
+GEMINI_BACKOFF_SECONDS = 2.0
+
+_gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENT)
+_gemini_rate_lock = threading.Lock()
+_gemini_rate = {'next_call': 0.0}
+
 def clean_json_response(text):
     if text.startswith('```json'):
         return text.replace('```json', '').replace('```', '').strip()
@@ -20,6 +41,26 @@ def clean_json_response(text):
         return text.replace('```', '').strip()
     return text.strip()
 
+def scan_json_chunk(chunk, state):
+    """Track bracket depth across streamed chunks; return the index just past the end of the first top-level JSON value"""
+    for i, char in enumerate(chunk):
+        if state['in_string']:
+            if state['escape']:
+                state['escape'] = False
+            elif char == '\\':
+                state['escape'] = True
+            elif char == '"':
+                state['in_string'] = False
+        elif char == '"':
+            state['in_string'] = state['depth'] > 0
+        elif char in '{[':
+            state['depth'] += 1
+        elif char in '}]' and state['depth'] > 0:
+            state['depth'] -= 1
+            if state['depth'] == 0:
+                return i + 1
+    return None
+
 def get_indian_timestamp(submission):
     ist = pytz.timezone('Asia/Kolkata')
     post_time_utc = datetime.fromtimestamp(submission.created_utc, tz=timezone.utc)
@@ -29,6 +70,36 @@ def get_indian_timestamp(submission):
         'formatted_ist': post_time_ist.strftime('%d %B %Y, %I:%M %p IST')
     }
 
+def wait_for_gemini_turn():
+    with _gemini_rate_lock:
+        now = time.monotonic()
+        start = max(now, _gemini_rate['next_call'])
+        _gemini_rate['next_call'] = start + GEMINI_MIN_INTERVAL_SECONDS
+    if start > now:
+        time.sleep(start - now)
+
+def delay_gemini_calls(delay):
+    with _gemini_rate_lock:
+        _gemini_rate['next_call'] = max(_gemini_rate['next_call'], time.monotonic() + delay)
+
+def stream_gemini_text(model_name, contents, config):
+    response_chunks = []
+    scan_state = {'depth': 0, 'in_string': False, 'escape': False}
+    stream = gemini_client.models.generate_content_stream(model=model_name, contents=contents, config=config)
+    for chunk in stream:
+        if chunk.text:
+            end = scan_json_chunk(chunk.text, scan_state)
+            if end is not None:
+                # The JSON is complete; stop reading so the model doesn't keep generating the closing fence
+                response_chunks.append(chunk.text[:end])
+                close_stream = getattr(stream, 'close', None)
+                if close_stream:
+                    close_stream()
+                break
+            response_chunks.append(chunk.text)
+    
+    return ''.join(response_chunks).strip()
+
 def call_gemini_api(text, system_instruction, model_name="gemini-2.5-flash", use_search=False):
     contents = [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
     
@@ -40,26 +111,25 @@ def call_gemini_api(text, system_instruction, model_name="gemini-2.5-flash", use
     if use_search and model_name == "gemini-2.5-pro":
         config.tools = [types.Tool(googleSearch=types.GoogleSearch())]
     
-    try:
-        response_chunks = []
-        for chunk in gemini_client.models.generate_content_stream(model=model_name, contents=contents, config=config):
-            if chunk.text:
-                response_chunks.append(chunk.text)
-        
-        response_text = ''.join(response_chunks).strip()
-        return json.loads(clean_json_response(response_text)) if response_text else None
-        
-    except Exception:
-        return None
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        wait_for_gemini_turn()
+        try:
+            with _gemini_slots:
+                response_text = stream_gemini_text(model_name, contents, config)
+            return json.loads(clean_json_response(response_text)) if response_text else None
+            
+        except Exception as e:
+            if getattr(e, 'code', None) != 429 or attempt == GEMINI_MAX_RETRIES:
+                return None
+            
+            delay = GEMINI_BACKOFF_SECONDS * 2 ** attempt + random.uniform(0, 1)
+            print(f"⏳ Gemini rate limit hit, retrying in {delay:.1f}s")
+            delay_gemini_calls(delay)
 
 def call_perplexity_api(text, system_instruction, model_name="sonar"):
     try:
-        response = requests.post(
+        response = pplx_session.post(
             'https://api.perplexity.ai/chat/completions',
-            headers={
-                'Authorization': f'Bearer {pplx_api_key}',
-                'Content-Type': 'application/json'
-            },
             json={
                 'model': model_name,
                 'messages': [
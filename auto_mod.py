@@ -1,9 +1,11 @@
 import praw
 import os
+import re
 import time
+import hashlib
 from dotenv import load_dotenv
 from analysis import get_indian_timestamp, call_gemini_api, extract_disaster_info
-from database import store_analysis
+from database import store_analysis, store_analyses, get_cached_moderation, cache_moderations
 from email_notifications import send_disaster_alert_email
 
 def initialize_reddit():
@@ -35,8 +37,12 @@ def initialize_reddit():
     
     return reddit
 
-def check_post_moderation(text):
-    system_instruction = """You are a content moderator for a disaster hazards subreddit. Analyze posts and return JSON with these fields:
+MODERATION_BATCH_SIZE = 16
+# Idle polls back off 1, 2, 4, 8, 16s like praw's own stream backoff, resetting once posts arrive
+STREAM_IDLE_MIN_SECONDS = 1
+STREAM_IDLE_MAX_SECONDS = 16
+
+MODERATION_INSTRUCTION = """You are a content moderator for a disaster hazards subreddit. Analyze posts and return JSON with these fields:
 - city: true if mentions ANY specific geographic place name (city, town, village, district, state, region, landmark), false otherwise
 - location: true if mentions any location/place (village, state, country, etc.), false otherwise
 - promoting: true if promotes brands/products/services/businesses/companies/advertisements, false otherwise
@@ -61,13 +67,68 @@ IMPORTANT:
 - Geographic locations, villages, cities, states are NOT promotional content.
 Only flag as promoting if it advertises businesses, products, or services.
 Return only valid JSON, no markdown formatting."""
-    
-    result = call_gemini_api(f"Text to analyze: {text}", system_instruction)
-    if result:
+
+BATCH_MODERATION_INSTRUCTION = MODERATION_INSTRUCTION + """
+
+You will receive several posts, each starting with 'POST <n>:'. Return a JSON array with exactly one object per post, in the same order as the posts."""
+
+# Keying the content hash on the prompt means cached verdicts expire whenever the moderation rules change
+MODERATION_HASH_KEY = hashlib.blake2b(MODERATION_INSTRUCTION.encode(), digest_size=32).digest()
+
+def moderation_hash(text):
+    normalized = re.sub(r'\s+', ' ', text.lower()).strip()
+    return hashlib.blake2b(normalized.encode(), digest_size=16, key=MODERATION_HASH_KEY).hexdigest()
+
+def moderation_flags(result):
+    if result and isinstance(result, dict):
         return result.get('city', False), result.get('location', False), result.get('promoting', False)
-    return False, False, True
+    return None
 
-def process_single_post(submission):
+def check_post_moderation(text):
+    content_hash = moderation_hash(text)
+    cached = get_cached_moderation(content_hash)
+    if cached:
+        return cached
+    
+    flags = moderation_flags(call_gemini_api(f"Text to analyze: {text}", MODERATION_INSTRUCTION))
+    if flags is None:
+        return False, False, True
+    
+    cache_moderations([(content_hash, flags)])
+    return flags
+
+def check_posts_moderation(texts):
+    """Moderate several posts with one Gemini request, reusing cached verdicts; posts get None if that request fails"""
+    hashes = [moderation_hash(text) for text in texts]
+    moderations = {content_hash: get_cached_moderation(content_hash) for content_hash in hashes}
+    
+    # Identical posts in the batch are only sent once
+    uncached = {content_hash: text for content_hash, text in zip(hashes, texts) if moderations[content_hash] is None}
+    
+    if len(uncached) == 1:
+        content_hash, text = next(iter(uncached.items()))
+        moderations[content_hash] = check_post_moderation(text)
+    elif uncached:
+        numbered = "\n\n".join(f"POST {i}: {text}" for i, text in enumerate(uncached.values(), 1))
+        results = call_gemini_api(f"Texts to analyze:\n\n{numbered}", BATCH_MODERATION_INSTRUCTION)
+        
+        if results is None:
+            # The call itself failed; retrying post by post would only multiply traffic during an outage,
+            # and a fail-closed verdict would remove every post in the batch as promotion
+            print(f"⚠️ Batch moderation call failed, leaving {len(uncached)} posts unmoderated for the next pass")
+            moderations.update((content_hash, None) for content_hash in uncached)
+        elif isinstance(results, list) and len(results) == len(uncached):
+            fresh = [(content_hash, moderation_flags(result)) for content_hash, result in zip(uncached, results)]
+            cache_moderations([(content_hash, flags) for content_hash, flags in fresh if flags is not None])
+            moderations.update((content_hash, flags or (False, False, True)) for content_hash, flags in fresh)
+        else:
+            print("⚠️ Batch moderation response did not line up with the posts, checking them one by one")
+            for content_hash, text in uncached.items():
+                moderations[content_hash] = check_post_moderation(text)
+    
+    return [moderations[content_hash] for content_hash in hashes]
+
+def process_single_post(submission, moderation=None, analyses=None):
     print(f"\n--- Processing Post ---")
     print(f"Title: {submission.title}")
     print(f"Author: {submission.author}")
@@ -77,7 +138,9 @@ def process_single_post(submission):
     print(f"Posted: {timestamp_info['formatted_ist']}")
     
     content = submission.title + " " + (submission.selftext or "")
-    has_city, has_location, is_promo = check_post_moderation(content)
+    if moderation is None:
+        moderation = check_post_moderation(content)
+    has_city, has_location, is_promo = moderation
     
     print(f"Analysis - City: {has_city}, Location: {has_location}, Promotion: {is_promo}")
     
@@ -136,7 +199,10 @@ def process_single_post(submission):
             print(f"📧 Sending email alert to {disaster_info.get('region', 'unknown')} region...")
             send_disaster_alert_email(disaster_info, submission)
     
-    store_analysis(submission, disaster_info, approved)
+    if analyses is None:
+        store_analysis(submission, disaster_info, approved)
+    else:
+        analyses.append((submission, disaster_info, approved))
     return approved
 
 def process_existing_posts(reddit, subreddit_name, limit=25):
@@ -147,19 +213,60 @@ def process_existing_posts(reddit, subreddit_name, limit=25):
         subreddit = reddit.subreddit(subreddit_name)
         
         print("Scanning recent posts...")
-        for submission in subreddit.new(limit=limit):
-            if submission.approved or submission.removed:
-                continue
-            
-            process_single_post(submission)
-            time.sleep(2)
+        pending = [submission for submission in subreddit.new(limit=limit)
+                   if not (submission.approved or submission.removed)]
+        
+        # Posts without a verdict stay unmoderated, so the next scan picks them up again
+        for start in range(0, len(pending), MODERATION_BATCH_SIZE):
+            process_post_batch(pending[start:start + MODERATION_BATCH_SIZE], delay=2)
             
     except Exception as e:
         print(f"Error processing existing posts: {e}")
 
+def process_post_batch(batch, delay):
+    """Moderate and act on a batch of posts; returns the posts left without a verdict"""
+    moderations = check_posts_moderation(
+        [submission.title + " " + (submission.selftext or "") for submission in batch])
+    
+    # Store the whole batch in one transaction, even if a later post in it fails
+    analyses = []
+    deferred = []
+    try:
+        for submission, moderation in zip(batch, moderations):
+            if moderation is None:
+                print(f"⏸️ No moderation verdict for post {submission.id}, leaving it untouched")
+                deferred.append(submission)
+                continue
+            
+            process_single_post(submission, moderation, analyses)
+            time.sleep(delay)
+    finally:
+        store_analyses(analyses)
+    
+    return deferred
+
 def monitor_new_posts(reddit, subreddit_name):
     print("\nNow monitoring for new posts...")
     
-    for submission in reddit.subreddit(subreddit_name).stream.submissions(skip_existing=True):
-        process_single_post(submission)
-        time.sleep(1)
+    # pause_after=-1 makes the stream yield None whenever a poll finds nothing new, so posts
+    # that arrived together are moderated as one batch; praw skips its own backoff sleep then
+    batch = []
+    idle_delay = STREAM_IDLE_MIN_SECONDS
+    for submission in reddit.subreddit(subreddit_name).stream.submissions(skip_existing=True, pause_after=-1):
+        if submission is not None:
+            idle_delay = STREAM_IDLE_MIN_SECONDS
+            batch.append(submission)
+            if len(batch) < MODERATION_BATCH_SIZE:
+                continue
+        
+        if batch:
+            # Posts without a verdict go back into the next batch
+            deferred = process_post_batch(batch[:MODERATION_BATCH_SIZE], delay=1)
+            batch = deferred + batch[MODERATION_BATCH_SIZE:]
+            if deferred:
+                # Moderation is failing; back off before retrying the same posts
+                time.sleep(idle_delay)
+                idle_delay = min(idle_delay * 2, STREAM_IDLE_MAX_SECONDS)
+        else:
+            time.sleep(idle_delay)
+            idle_delay = min(idle_delay * 2, STREAM_IDLE_MAX_SECONDS)
@@ -1,47 +1,109 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
 
-def create_database():
+def _connect():
     conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
+_local = threading.local()
+
+def get_connection():
+    """Long-lived connection for the calling thread, so SQLite's page cache stays warm between queries"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+def _sql_limit(limit):
+    # SQLite treats a negative LIMIT as "no limit"
+    return -1 if limit is None else limit
+
+# post_time holds naive ISO strings; strftime('%s') reads them as UTC seconds
+POST_TIME_EPOCH_COLUMN = "post_time_epoch INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', post_time) AS INTEGER)) VIRTUAL"
+
+SCHEMA_DDL = '''
+    PRAGMA page_size=8192;
+    PRAGMA journal_mode=WAL;
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS disaster_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            post_id TEXT UNIQUE,
-            title TEXT,
-            content TEXT,
-            author TEXT,
-            post_time TEXT,
-            place TEXT,
-            region TEXT,
-            disaster_type TEXT,
-            urgency_level INTEGER,
-            confidence_level INTEGER,
-            sources TEXT,
-            approved BOOLEAN
-        )
-    ''')
+    BEGIN;
+    CREATE TABLE IF NOT EXISTS disaster_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_id TEXT UNIQUE,
+        title TEXT,
+        content TEXT,
+        author TEXT,
+        post_time TEXT,
+        place TEXT,
+        region TEXT,
+        disaster_type TEXT,
+        urgency_level INTEGER,
+        confidence_level INTEGER,
+        sources TEXT,
+        approved BOOLEAN,
+        ''' + POST_TIME_EPOCH_COLUMN + '''
+    );
+    CREATE INDEX IF NOT EXISTS idx_disaster_posts_post_time ON disaster_posts(post_time);
+    CREATE INDEX IF NOT EXISTS idx_disaster_posts_approved_epoch ON disaster_posts(post_time_epoch) WHERE approved = 1;
+    CREATE INDEX IF NOT EXISTS idx_disaster_posts_type_time ON disaster_posts(disaster_type, post_time);
+    CREATE INDEX IF NOT EXISTS idx_disaster_posts_high_urgency_time ON disaster_posts(post_time) WHERE urgency_level = 3;
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        place TEXT PRIMARY KEY,
+        lat REAL,
+        lon REAL,
+        country TEXT
+    );
+    CREATE TABLE IF NOT EXISTS moderation_cache (
+        content_hash TEXT PRIMARY KEY,
+        city BOOLEAN,
+        location BOOLEAN,
+        promoting BOOLEAN
+    );
+    COMMIT;
     
-    conn.commit()
+    PRAGMA analysis_limit=400;
+    ANALYZE;
+'''
+
+def create_database():
+    # page_size only takes effect before the first table is created in a fresh file,
+    # and journal_mode cannot change inside a transaction, so both precede BEGIN
+    conn = _connect()
+    _add_post_time_epoch_column(conn)
+    conn.executescript(SCHEMA_DDL)
     conn.close()
+    _stored_columns.clear()
 
-def store_analysis(submission, disaster_info, approved):
-    if not approved:
-        print(f"Skipping database storage for rejected post {submission.id}")
-        return
-    
-    conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute('''
-            INSERT OR REPLACE INTO disaster_posts 
-            (post_id, title, content, author, post_time, place, region, 
-             disaster_type, urgency_level, confidence_level, sources, approved)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+def _add_post_time_epoch_column(conn):
+    # Databases created before post_time_epoch existed get the generated column added in place
+    columns = [row[1] for row in conn.execute('PRAGMA table_xinfo(disaster_posts)')]
+    if columns and 'post_time_epoch' not in columns:
+        conn.execute('ALTER TABLE disaster_posts ADD COLUMN ' + POST_TIME_EPOCH_COLUMN)
+        conn.commit()
+
+STORE_ANALYSIS_SQL = '''
+    INSERT OR REPLACE INTO disaster_posts 
+    (post_id, title, content, author, post_time, place, region, 
+     disaster_type, urgency_level, confidence_level, sources, approved)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def store_analyses(analyses):
+    """Store (submission, disaster_info, approved) entries, writing all approved posts in one transaction"""
+    rows = []
+    stored_ids = []
+    for submission, disaster_info, approved in analyses:
+        if not approved:
+            print(f"Skipping database storage for rejected post {submission.id}")
+            continue
+        
+        rows.append((
             submission.id,
             submission.title,
             submission.selftext,
@@ -55,41 +117,76 @@ def store_analysis(submission, disaster_info, approved):
             json.dumps(disaster_info.get('sources', [])),
             approved
         ))
-        
-        conn.commit()
-        print(f"Stored analysis for approved post {submission.id} in database")
+        stored_ids.append(submission.id)
+    
+    if not rows:
+        return
+    
+    conn = get_connection()
+    
+    try:
+        with conn:
+            conn.executemany(STORE_ANALYSIS_SQL, rows)
+        for post_id in stored_ids:
+            print(f"Stored analysis for approved post {post_id} in database")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-    finally:
-        conn.close()
 
-def get_all_analyses():
-    conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
+def store_analysis(submission, disaster_info, approved):
+    store_analyses([(submission, disaster_info, approved)])
+
+def get_cached_moderation(content_hash):
+    try:
+        cursor = get_connection().cursor()
+        cursor.execute('SELECT city, location, promoting FROM moderation_cache WHERE content_hash = ?', (content_hash,))
+        row = cursor.fetchone()
+    except sqlite3.Error:
+        return None
     
-    cursor.execute('SELECT * FROM disaster_posts ORDER BY post_time DESC')
+    return tuple(bool(flag) for flag in row) if row else None
+
+def cache_moderations(moderations):
+    """Remember (content_hash, (city, location, promoting)) results so repeated posts skip the moderation call"""
+    conn = get_connection()
+    
+    try:
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO moderation_cache (content_hash, city, location, promoting) VALUES (?, ?, ?, ?)',
+                             [(content_hash, *flags) for content_hash, flags in moderations])
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not cache moderation results: {e}")
+
+_stored_columns = {}
+
+def _disaster_post_columns():
+    """Stored columns of disaster_posts, which is what SELECT * returned before post_time_epoch existed"""
+    # table_info leaves out generated columns, and keeps any legacy columns such as analysis_time in place
+    if 'sql' not in _stored_columns:
+        columns = [row[1] for row in get_connection().execute('PRAGMA table_info(disaster_posts)')]
+        _stored_columns['sql'] = ', '.join(columns)
+    return _stored_columns['sql']
+
+def get_all_analyses(limit=None):
+    cursor = get_connection().cursor()
+    
+    cursor.execute(f'SELECT {_disaster_post_columns()} FROM disaster_posts ORDER BY post_time DESC LIMIT ?', (_sql_limit(limit),))
     results = cursor.fetchall()
     
-    conn.close()
     return results
 
-def get_analyses_by_disaster_type(disaster_type):
-    conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
+def get_analyses_by_disaster_type(disaster_type, limit=None):
+    cursor = get_connection().cursor()
     
-    cursor.execute('SELECT * FROM disaster_posts WHERE disaster_type = ? ORDER BY post_time DESC', (disaster_type,))
+    cursor.execute(f'SELECT {_disaster_post_columns()} FROM disaster_posts WHERE disaster_type = ? ORDER BY post_time DESC LIMIT ?', (disaster_type, _sql_limit(limit)))
     results = cursor.fetchall()
     
-    conn.close()
     return results
 
-def get_high_urgency_posts():
-    conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
+def get_high_urgency_posts(limit=None):
+    cursor = get_connection().cursor()
     
-    cursor.execute('SELECT * FROM disaster_posts WHERE urgency_level = 3 ORDER BY post_time DESC')
+    cursor.execute(f'SELECT {_disaster_post_columns()} FROM disaster_posts WHERE urgency_level = 3 ORDER BY post_time DESC LIMIT ?', (_sql_limit(limit),))
     results = cursor.fetchall()
     
-    conn.close()
     return results
@@ -2,213 +2,419 @@ import sqlite3
 import json
 from datetime import datetime, timedelta
 from collections import defaultdict
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import time
+import calendar
+import importlib.util
+import os
+import webbrowser
+from pathlib import Path
+from database import create_database, get_connection
 
 try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
+    import orjson
+    json_loads = orjson.loads
+    def json_dumps_bytes(obj):
+        # Match the json fallback, which writes non-string keys such as a NULL region as "null"
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
 except ImportError:
-    PLOTLY_AVAILABLE = False
+    json_loads = json.loads
+    def json_dumps_bytes(obj):
+        return json.dumps(obj).encode()
+
+# The plotting and mapping libraries are only imported by the functions that draw with them;
+# here we just check that they are installed so statistics-only callers start quickly
+PLOTLY_AVAILABLE = importlib.util.find_spec('plotly') is not None
+if not PLOTLY_AVAILABLE:
     print("Plotly not available. Using matplotlib for basic plotting.")
 
-try:
-    import folium
-    from folium.plugins import HeatMap
-    FOLIUM_AVAILABLE = True
-except ImportError:
-    FOLIUM_AVAILABLE = False
-    print("Folium not available. Using matplotlib for mapping.")
+FOLIUM_AVAILABLE = importlib.util.find_spec('folium') is not None
+if not FOLIUM_AVAILABLE:
+    print("Folium not available. Using a basic SVG map.")
 
-try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-    GEOPY_AVAILABLE = True
-except ImportError:
-    GEOPY_AVAILABLE = False
+GEOPY_AVAILABLE = importlib.util.find_spec('geopy') is not None
+if not GEOPY_AVAILABLE:
     print("⚠️ Geopy not available. Install with: pip install geopy")
 
+# Basic world coordinates, keyed by the lowercase region names stored in the database
+REGION_COORDS = {
+    'north_america': {'lat': 45.0, 'lon': -100.0},
+    'asia': {'lat': 30.0, 'lon': 100.0},
+    'europe': {'lat': 50.0, 'lon': 10.0},
+    'south_america': {'lat': -15.0, 'lon': -60.0},
+    'africa': {'lat': 0.0, 'lon': 20.0},
+    'oceania': {'lat': -25.0, 'lon': 140.0}
+}
+
+CACHE_TTL_SECONDS = 60
+FETCH_BATCH_SIZE = 1000
+_disaster_cache = {'timestamp': 0, 'data': None}
+_statistics_cache = {'timestamp': 0, 'data': None}
+_groupings_cache = {'source': None, 'data': None}
+_arrays_cache = {'source': None, 'data': None}
+
+DISASTER_COLORS = {
+    'earthquake': '#FF6B35',
+    'flood': '#1E88E5', 
+    'fire': '#E53935',
+    'storm': '#8E24AA',
+    'other': '#43A047'
+}
+
+# Indexed by urgency level (1-3); slot 0 keeps the low-urgency green for unknown levels
+URGENCY_COLORS = ('#27ae60', '#27ae60', '#f39c12', '#e74c3c')
+# Indexed by urgency level (1-3); slot 0 is never a valid level
+URGENCY_LABELS = ('unknown', 'low', 'moderate', 'high')
+
+# Marker HTML is built once here; the map loop only substitutes the per-disaster fields
+HOVER_TEMPLATE = """
+            🔥 {disaster_type} in {place}
+            📍 {country}
+            ⚠️ Urgency: {urgency}/3
+            🎯 Confidence: {confidence}/10
+            📅 {post_time}
+            👤 by {author}
+            """
+
+POPUP_TEMPLATE = """
+            <div style="width: 350px; font-family: Arial; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 15px; margin: -15px;">
+                <h2 style="margin: 0 0 15px 0; color: #fff; text-align: center; text-shadow: 2px 2px 4px rgba(0,0,0,0.5);">
+                    🌍 {place}
+                </h2>
+                
+                <div style="background: rgba(255,255,255,0.9); color: #333; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-bottom: 10px;">
+                        <div style="text-align: center; background: {type_color}; color: white; padding: 8px; border-radius: 5px;">
+                            <strong>{disaster_type}</strong>
+                        </div>
+                        <div style="text-align: center; background: {urgency_color}; color: white; padding: 8px; border-radius: 5px;">
+                            Urgency: {urgency}/3
+                        </div>
+                    </div>
+                    
+                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;">
+                        <div style="text-align: center; background: #3498db; color: white; padding: 8px; border-radius: 5px;">
+                            Confidence: {confidence}/10
+                        </div>
+                        <div style="text-align: center; background: #9b59b6; color: white; padding: 8px; border-radius: 5px;">
+                            {region}
+                        </div>
+                    </div>
+                </div>
+                
+                <div style="background: rgba(0,0,0,0.1); padding: 12px; border-radius: 8px; font-size: 13px;">
+                    <p style="margin: 5px 0;"><strong>📰 Title:</strong> {title}</p>
+                    <p style="margin: 5px 0;"><strong>👤 Author:</strong> {author}</p>
+                    <p style="margin: 5px 0;"><strong>📅 Time:</strong> {post_time}</p>
+                    <p style="margin: 5px 0;"><strong>🌍 Location:</strong> {country}</p>
+                </div>
+            </div>
+            """
+
+render_hover_text = HOVER_TEMPLATE.format
+render_popup = POPUP_TEMPLATE.format
+
+# Every query is a fixed, parameterized string so the long-lived connection's statement
+# cache prepares each one once per process and only rebinds the cutoff afterwards
+RECENT_DISASTERS_SQL = '''
+    SELECT id, post_id, title, content, author, post_time, place, region,
+           disaster_type, urgency_level, confidence_level, sources, approved
+    FROM disaster_posts 
+    WHERE post_time_epoch >= ? AND approved = 1
+    ORDER BY post_time_epoch DESC
+'''
+
+RECENT_STATISTICS_SQL = '''
+    SELECT region, disaster_type, urgency_level, COUNT(*), SUM(confidence_level)
+    FROM disaster_posts 
+    WHERE post_time_epoch >= ? AND approved = 1
+    GROUP BY region, disaster_type, urgency_level
+'''
+
+RECENT_COORDINATES_SQL = '''
+    SELECT place, region, disaster_type, urgency_level, confidence_level, title, post_id
+    FROM disaster_posts 
+    WHERE post_time_epoch >= ? AND approved = 1
+    ORDER BY post_time_epoch DESC
+'''
+
+RECENT_FINGERPRINT_SQL = '''
+    SELECT COUNT(*), MAX(id) FROM disaster_posts 
+    WHERE post_time_epoch >= ? AND approved = 1
+'''
+
+GEOCODE_LOOKUP_SQL = 'SELECT lat, lon, country FROM geocode_cache WHERE place = ?'
+GEOCODE_STORE_SQL = 'INSERT OR REPLACE INTO geocode_cache (place, lat, lon, country) VALUES (?, ?, ?, ?)'
+
+def get_cutoff_epoch(hours=24):
+    # post_time_epoch reads the naive local post_time as if it were UTC, so build the cutoff the same way
+    return calendar.timegm((datetime.now() - timedelta(hours=hours)).timetuple())
+
+def iter_last_24_hours_disasters(include_sources=False):
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    
+    cutoff_epoch = get_cutoff_epoch()
+    
+    cursor.execute(RECENT_DISASTERS_SQL, (cutoff_epoch,))
+    
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            yield {
+                'id': row['id'],
+                'post_id': row['post_id'],
+                'title': row['title'],
+                'content': row['content'],
+                'author': row['author'],
+                'post_time': row['post_time'],
+                'place': row['place'],
+                'region': row['region'],
+                'disaster_type': row['disaster_type'],
+                'urgency_level': row['urgency_level'],
+                'confidence_level': row['confidence_level'],
+                # Only the export reads sources, so skip decoding the JSON for every other caller
+                'sources': (json_loads(row['sources']) if row['sources'] else []) if include_sources else None,
+                'approved': bool(row['approved'])
+            }
+
 def get_last_24_hours_disasters():
-    conn = sqlite3.connect('disaster_analysis.db')
-    cursor = conn.cursor()
-    
-    twenty_four_hours_ago = (datetime.now() - timedelta(hours=24)).isoformat()
-    
-    cursor.execute('''
-        SELECT * FROM disaster_posts 
-        WHERE post_time >= ? AND approved = 1
-        ORDER BY post_time DESC
-    ''', (twenty_four_hours_ago,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    disasters = []
-    for row in results:
-        disaster = {
-            'id': row[0],
-            'post_id': row[1],
-            'title': row[2],
-            'content': row[3],
-            'author': row[4],
-            'post_time': row[5],
-            'place': row[7],
-            'region': row[8],
-            'disaster_type': row[9],
-            'urgency_level': row[10],
-            'confidence_level': row[11],
-            'sources': json.loads(row[12]) if row[12] else [],
-            'approved': bool(row[13])
-        }
-        disasters.append(disaster)
-    
-    return disasters
+    # A single dashboard render calls this many times; reuse the parsed rows for a short window
+    now = time.time()
+    if _disaster_cache['data'] is None or now - _disaster_cache['timestamp'] >= CACHE_TTL_SECONDS:
+        _disaster_cache['data'] = list(iter_last_24_hours_disasters())
+        _disaster_cache['timestamp'] = now
+    return _disaster_cache['data']
 
-def get_disasters_by_region():
+def clear_disaster_cache():
+    _disaster_cache['data'] = None
+    _statistics_cache['data'] = None
+    _groupings_cache['source'] = None
+    _arrays_cache['source'] = None
+
+def get_all_groupings():
+    """Group the cached disasters by region, type and urgency in a single pass"""
     disasters = get_last_24_hours_disasters()
-    regions = defaultdict(list)
     
-    for disaster in disasters:
-        regions[disaster['region']].append(disaster)
+    if _groupings_cache['source'] is disasters:
+        return _groupings_cache['data']
     
-    return dict(regions)
-
-def get_disasters_by_type():
-    disasters = get_last_24_hours_disasters()
+    regions = defaultdict(list)
     types = defaultdict(list)
+    urgency = defaultdict(list)
     
     for disaster in disasters:
+        regions[disaster['region']].append(disaster)
         types[disaster['disaster_type']].append(disaster)
+        urgency_level = disaster['urgency_level']
+        urgency_label = URGENCY_LABELS[urgency_level] if urgency_level in (1, 2, 3) else 'unknown'
+        urgency[urgency_label].append(disaster)
+    
+    groupings = {
+        'by_region': dict(regions),
+        'by_type': dict(types),
+        'by_urgency': dict(urgency)
+    }
     
-    return dict(types)
+    _groupings_cache['source'] = disasters
+    _groupings_cache['data'] = groupings
+    return groupings
 
-def get_disasters_by_urgency():
+def get_disaster_arrays():
+    """Numeric columns of the cached disasters as NumPy arrays, aligned with the row order"""
     disasters = get_last_24_hours_disasters()
-    urgency = defaultdict(list)
     
-    for disaster in disasters:
-        urgency_level = disaster['urgency_level']
-        urgency_label = {1: 'low', 2: 'moderate', 3: 'high'}.get(urgency_level, 'unknown')
-        urgency[urgency_label].append(disaster)
+    if _arrays_cache['source'] is disasters:
+        return _arrays_cache['data']
     
-    return dict(urgency)
+    count = len(disasters)
+    arrays = {
+        'confidence_level': np.fromiter((d['confidence_level'] or 0 for d in disasters), dtype=np.int16, count=count),
+        'urgency_level': np.fromiter((d['urgency_level'] or 0 for d in disasters), dtype=np.int16, count=count)
+    }
+    
+    _arrays_cache['source'] = disasters
+    _arrays_cache['data'] = arrays
+    return arrays
+
+def get_disasters_by_region():
+    return get_all_groupings()['by_region']
+
+def get_disasters_by_type():
+    return get_all_groupings()['by_type']
+
+def get_disasters_by_urgency():
+    return get_all_groupings()['by_urgency']
 
 def get_disaster_statistics():
-    disasters = get_last_24_hours_disasters()
+    now = time.time()
+    if _statistics_cache['data'] is not None and now - _statistics_cache['timestamp'] < CACHE_TTL_SECONDS:
+        return _statistics_cache['data']
+    
+    cursor = get_connection().cursor()
+    
+    cutoff_epoch = get_cutoff_epoch()
+    
+    # Let SQLite do the counting in one scan; only the small grouped result comes back to Python
+    cursor.execute(RECENT_STATISTICS_SQL, (cutoff_epoch,))
+    
+    region_counts = defaultdict(int)
+    type_counts = defaultdict(int)
+    urgency_counts = defaultdict(int)
+    total_disasters = 0
+    total_confidence = 0
+    
+    for region, disaster_type, urgency_level, count, confidence_sum in cursor:
+        region_counts[region] += count
+        type_counts[disaster_type] += count
+        urgency_label = URGENCY_LABELS[urgency_level] if urgency_level in (1, 2, 3) else 'unknown'
+        urgency_counts[urgency_label] += count
+        total_disasters += count
+        total_confidence += confidence_sum or 0
     
     stats = {
-        'total_disasters': len(disasters),
-        'by_region': {},
-        'by_type': {},
-        'by_urgency': {},
-        'average_confidence': 0
+        'total_disasters': total_disasters,
+        'by_region': dict(region_counts),
+        'by_type': dict(type_counts),
+        'by_urgency': dict(urgency_counts),
+        'average_confidence': round(total_confidence / total_disasters, 2) if total_disasters else 0
     }
     
-    if disasters:
-        region_counts = defaultdict(int)
-        type_counts = defaultdict(int)
-        urgency_counts = defaultdict(int)
-        total_confidence = 0
-        
-        for disaster in disasters:
-            region_counts[disaster['region']] += 1
-            type_counts[disaster['disaster_type']] += 1
-            urgency_level = disaster['urgency_level']
-            urgency_label = {1: 'low', 2: 'moderate', 3: 'high'}.get(urgency_level, 'unknown')
-            urgency_counts[urgency_label] += 1
-            total_confidence += disaster['confidence_level']
-        
-        stats['by_region'] = dict(region_counts)
-        stats['by_type'] = dict(type_counts)
-        stats['by_urgency'] = dict(urgency_counts)
-        stats['average_confidence'] = round(total_confidence / len(disasters), 2)
-    
+    _statistics_cache['timestamp'] = now
+    _statistics_cache['data'] = stats
     return stats
 
 def get_high_priority_disasters():
-    disasters = get_last_24_hours_disasters()
-    high_priority = [d for d in disasters if d['urgency_level'] == 3]
-    return high_priority
+    return get_all_groupings()['by_urgency'].get('high', [])
 
 def display_disaster_summary():
-    print("\n" + "="*60)
-    print("DISASTER MAP - LAST 24 HOURS SUMMARY")
-    print("="*60)
-    
-    disasters = get_last_24_hours_disasters()
     stats = get_disaster_statistics()
     
-    print(f"📊 Total Approved Disasters: {stats['total_disasters']}")
-    print(f"📈 Average Confidence Level: {stats['average_confidence']}/10")
-    
-    print("\n🌍 BY REGION:")
-    for region, count in stats['by_region'].items():
-        print(f"  {region.title()}: {count}")
+    lines = [
+        "\n" + "="*60,
+        "DISASTER MAP - LAST 24 HOURS SUMMARY",
+        "="*60,
+        f"📊 Total Approved Disasters: {stats['total_disasters']}",
+        f"📈 Average Confidence Level: {stats['average_confidence']}/10",
+        "\n🌍 BY REGION:"
+    ]
+    lines.extend(f"  {region.title()}: {count}" for region, count in stats['by_region'].items())
     
-    print("\n🔥 BY DISASTER TYPE:")
-    for disaster_type, count in stats['by_type'].items():
-        print(f"  {disaster_type.title()}: {count}")
+    lines.append("\n🔥 BY DISASTER TYPE:")
+    lines.extend(f"  {disaster_type.title()}: {count}" for disaster_type, count in stats['by_type'].items())
     
-    print("\n⚠️ BY URGENCY LEVEL:")
-    for urgency, count in stats['by_urgency'].items():
-        print(f"  {urgency.title()}: {count}")
+    lines.append("\n⚠️ BY URGENCY LEVEL:")
+    lines.extend(f"  {urgency.title()}: {count}" for urgency, count in stats['by_urgency'].items())
     
     high_priority = get_high_priority_disasters()
     if high_priority:
-        print(f"\n🚨 HIGH PRIORITY ALERTS ({len(high_priority)}):")
-        for disaster in high_priority:
-            print(f"  • {disaster['disaster_type'].title()} in {disaster['place']} (Confidence: {disaster['confidence_level']}/10)")
+        lines.append(f"\n🚨 HIGH PRIORITY ALERTS ({len(high_priority)}):")
+        lines.extend(f"  • {disaster['disaster_type'].title()} in {disaster['place']} (Confidence: {disaster['confidence_level']}/10)"
+                     for disaster in high_priority)
     else:
-        print("\n✅ No high priority alerts in the last 24 hours")
+        lines.append("\n✅ No high priority alerts in the last 24 hours")
     
-    print("\n" + "="*60)
+    lines.append("\n" + "="*60)
+    print("\n".join(lines))
 
 def export_disasters_json():
-    disasters = get_last_24_hours_disasters()
     stats = get_disaster_statistics()
-    
-    export_data = {
-        'timestamp': datetime.now().isoformat(),
-        'period': 'last_24_hours',
-        'statistics': stats,
-        'disasters': disasters
-    }
-    
-    filename = f"disaster_map_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    
-    with open(filename, 'w') as f:
-        json.dump(export_data, f, indent=2)
+    timestamp = datetime.now()
+    filename = f"disaster_map_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+    
+    # Stream rows straight from the cursor so the export never holds the whole window in memory,
+    # into a temporary file that only takes the real name once it is complete
+    temp_filename = filename + '.tmp'
+    try:
+        with open(temp_filename, 'wb') as f:
+            f.write(b'{\n')
+            f.write(b'  "timestamp": ' + json_dumps_bytes(timestamp.isoformat()) + b',\n')
+            f.write(b'  "period": "last_24_hours",\n')
+            f.write(b'  "statistics": ' + json_dumps_bytes(stats) + b',\n')
+            f.write(b'  "disasters": [')
+            separator = b'\n    '
+            for disaster in iter_last_24_hours_disasters(include_sources=True):
+                f.write(separator)
+                f.write(json_dumps_bytes(disaster))
+                separator = b',\n    '
+            f.write(b'\n  ]\n}\n')
+        
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
     
     print(f"✅ Disaster data exported to {filename}")
     return filename
 
 def get_disaster_coordinates():
-    disasters = get_last_24_hours_disasters()
-    coordinates = []
+    # Only the fields the map needs; skips the content and sources columns entirely
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
     
-    for disaster in disasters:
-        coord_data = {
-            'place': disaster['place'],
-            'region': disaster['region'],
-            'disaster_type': disaster['disaster_type'],
-            'urgency_level': disaster['urgency_level'],
-            'confidence_level': disaster['confidence_level'],
-            'title': disaster['title'],
-            'post_id': disaster['post_id']
-        }
-        coordinates.append(coord_data)
+    cutoff_epoch = get_cutoff_epoch()
+    
+    cursor.execute(RECENT_COORDINATES_SQL, (cutoff_epoch,))
+    
+    coordinates = [dict(row) for row in cursor]
     
     return coordinates
 
+def get_data_fingerprint():
+    """Cheap change marker for the last-24-hours window: row count plus newest row id"""
+    cursor = get_connection().cursor()
+    
+    cutoff_epoch = get_cutoff_epoch()
+    cursor.execute(RECENT_FINGERPRINT_SQL, (cutoff_epoch,))
+    
+    fingerprint = list(cursor.fetchone())
+    return fingerprint
+
+def get_cached_render(name, fingerprint):
+    """Return the file rendered for this fingerprint last time, if it is still on disk"""
+    try:
+        with open(f"{name}.cache.json") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    filename = cached.get('filename', name)
+    if cached.get('fingerprint') == fingerprint and os.path.exists(filename):
+        return filename
+    return None
+
+def save_render(name, fingerprint, filename):
+    with open(f"{name}.cache.json", 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'filename': filename}, f)
+
+def reuse_render(name, label):
+    """Return (cached filename or None, fingerprint); on a miss the in-process caches are dropped"""
+    fingerprint = get_data_fingerprint()
+    cached = get_cached_render(name, fingerprint)
+    if cached:
+        print(f"✅ {label} unchanged since last render: {cached}")
+    else:
+        # The data moved on since the last render, so don't draw it from a stale in-process cache
+        clear_disaster_cache()
+    return cached, fingerprint
+
+def show_render(filename):
+    webbrowser.open(Path(filename).resolve().as_uri())
+
 def create_interactive_regional_dashboard():
     """Create an interactive dashboard showing disasters by region"""
     if not PLOTLY_AVAILABLE:
         print("❌ Plotly not available. Installing...")
         return create_matplotlib_plots()
     
+    cached, fingerprint = reuse_render('disaster_dashboard', "Dashboard")
+    if cached:
+        show_render(cached)
+        return cached
+    
     disasters = get_last_24_hours_disasters()
     stats = get_disaster_statistics()
     
@@ -216,6 +422,9 @@ def create_interactive_regional_dashboard():
         print("No disaster data available for plotting.")
         return
     
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     # Create subplots
     fig = make_subplots(
         rows=2, cols=2,
@@ -259,8 +468,9 @@ def create_interactive_regional_dashboard():
     )
     
     # 4. Confidence vs Urgency Scatter Plot
-    confidence_levels = [d['confidence_level'] for d in disasters]
-    urgency_nums = [d['urgency_level'] for d in disasters]
+    arrays = get_disaster_arrays()
+    confidence_levels = arrays['confidence_level']
+    urgency_nums = arrays['urgency_level']
     places = [d['place'] for d in disasters]
     
     fig.add_trace(
@@ -290,21 +500,46 @@ def create_interactive_regional_dashboard():
     # Save and show
     filename = f"disaster_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
     fig.write_html(filename)
+    save_render('disaster_dashboard', fingerprint, filename)
     fig.show()
     
     print(f"✅ Interactive dashboard saved as {filename}")
     return filename
 
+def get_cached_coordinates(place_text):
+    """Look up a previously geocoded place in the persistent geocode_cache table"""
+    try:
+        cursor = get_connection().cursor()
+        cursor.execute(GEOCODE_LOOKUP_SQL, (place_text,))
+        return cursor.fetchone()
+    except sqlite3.Error:
+        return None
+
+def cache_coordinates(place_text, lat, lon, country):
+    try:
+        conn = get_connection()
+        conn.execute(GEOCODE_STORE_SQL, (place_text, lat, lon, country))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not cache coordinates for {place_text}: {e}")
+
 def create_world_disaster_map():
+    if not FOLIUM_AVAILABLE:
+        print("❌ Folium not available. Creating basic SVG map...")
+        return create_basic_world_map()
+    
+    filename = "disaster_map.html"
+    cached, fingerprint = reuse_render(filename, "World map")
+    if cached:
+        return cached
+    
     disasters = get_last_24_hours_disasters()
     
     if not disasters:
         print("No disaster data available for mapping.")
         return
     
-    if not FOLIUM_AVAILABLE:
-        print("❌ Folium not available. Creating basic matplotlib map...")
-        return create_basic_world_map()
+    import folium
     
     world_map = folium.Map(
         location=[20, 0],
@@ -317,46 +552,62 @@ def create_world_disaster_map():
         print("❌ Geopy not available. Please install with: pip install geopy")
         return
     
+    from geopy.geocoders import Nominatim
+    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+    from geopy.extra.rate_limiter import RateLimiter
+    
     geolocator = Nominatim(user_agent="disaster_map_app")
+    # Nominatim allows 1 request/second; the limiter only waits out whatever is left of that second.
+    # One attempt per place, as before: geopy's default retries would triple requests during an outage
+    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1, max_retries=0, swallow_exceptions=False)
+    # Places the geocoder errored on, as opposed to places it answered "not found" for
+    failed_places = []
     
     def get_city_coordinates(place_text):
-        """Get coordinates using geopy geocoding service"""
+        """Get coordinates from the geocode cache, falling back to the geopy geocoding service"""
+        cached = get_cached_coordinates(place_text)
+        if cached:
+            return cached
+        
         try:
             # Clean the place text
             place_clean = place_text.strip()
             
             # Try geocoding with a timeout
-            location = geolocator.geocode(place_clean, timeout=10)
+            location = geocode(place_clean, timeout=10)
             
             if location:
-                return location.latitude, location.longitude, location.address.split(',')[-1].strip()
+                coordinates = (location.latitude, location.longitude, location.address.split(',')[-1].strip())
+                cache_coordinates(place_text, *coordinates)
+                return coordinates
             else:
                 print(f"⚠️ Could not find coordinates for: {place_text}")
                 return None, None, None
                 
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             print(f"❌ Geocoding error for {place_text}: {e}")
+            failed_places.append(place_text)
             return None, None, None
         except Exception as e:
             print(f"❌ Unexpected error geocoding {place_text}: {e}")
+            failed_places.append(place_text)
             return None, None, None
     
-    disaster_colors = {
-        'earthquake': '#FF6B35',
-        'flood': '#1E88E5', 
-        'fire': '#E53935',
-        'storm': '#8E24AA',
-        'other': '#43A047'
-    }
+    disaster_colors = DISASTER_COLORS
+    type_color_for = disaster_colors.get
+    disaster_layer = folium.FeatureGroup(name='Disasters').add_to(world_map)
+    
+    # Resolve each distinct place once, in the background, while markers are built in order
+    geocoding_executor = ThreadPoolExecutor(max_workers=1)
+    place_futures = {place: geocoding_executor.submit(get_city_coordinates, place)
+                     for place in dict.fromkeys(d['place'] for d in disasters)}
+    geocoding_executor.shutdown(wait=False)
     
     for disaster in disasters:
         place_text = disaster['place']
         
         print(f"🔍 Geocoding: {place_text}")
-        lat, lon, country = get_city_coordinates(place_text)
-        
-        # Add small delay to respect rate limits
-        time.sleep(1)
+        lat, lon, country = place_futures[place_text].result()
         
         if lat and lon:
             disaster_type = disaster['disaster_type']
@@ -364,109 +615,36 @@ def create_world_disaster_map():
             confidence = disaster['confidence_level']
             region = disaster['region']
             
-            hover_text = f"""
-            🔥 {disaster_type.upper()} in {place_text}
-            📍 {country}
-            ⚠️ Urgency: {urgency}/3
-            🎯 Confidence: {confidence}/10
-            📅 {disaster['post_time'][:19].replace('T', ' ')}
-            👤 by {disaster['author']}
-            """
-            
-            popup_content = f"""
-            <div style="width: 350px; font-family: Arial; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 15px; margin: -15px;">
-                <h2 style="margin: 0 0 15px 0; color: #fff; text-align: center; text-shadow: 2px 2px 4px rgba(0,0,0,0.5);">
-                    🌍 {place_text}
-                </h2>
-                
-                <div style="background: rgba(255,255,255,0.9); color: #333; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-bottom: 10px;">
-                        <div style="text-align: center; background: {disaster_colors.get(disaster_type, '#666')}; color: white; padding: 8px; border-radius: 5px;">
-                            <strong>{disaster_type.title()}</strong>
-                        </div>
-                        <div style="text-align: center; background: {'#e74c3c' if urgency == 3 else '#f39c12' if urgency == 2 else '#27ae60'}; color: white; padding: 8px; border-radius: 5px;">
-                            Urgency: {urgency}/3
-                        </div>
-                    </div>
-                    
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;">
-                        <div style="text-align: center; background: #3498db; color: white; padding: 8px; border-radius: 5px;">
-                            Confidence: {confidence}/10
-                        </div>
-                        <div style="text-align: center; background: #9b59b6; color: white; padding: 8px; border-radius: 5px;">
-                            {region.replace('_', ' ').title()}
-                        </div>
-                    </div>
-                </div>
-                
-                <div style="background: rgba(0,0,0,0.1); padding: 12px; border-radius: 8px; font-size: 13px;">
-                    <p style="margin: 5px 0;"><strong>📰 Title:</strong> {disaster['title'][:80]}{'...' if len(disaster['title']) > 80 else ''}</p>
-                    <p style="margin: 5px 0;"><strong>👤 Author:</strong> {disaster['author']}</p>
-                    <p style="margin: 5px 0;"><strong>📅 Time:</strong> {disaster['post_time'][:19].replace('T', ' ')}</p>
-                    <p style="margin: 5px 0;"><strong>🌍 Location:</strong> {country}</p>
-                </div>
-            </div>
-            """
+            post_time = disaster['post_time'][:19].replace('T', ' ')
+            title = disaster['title']
+            type_color = type_color_for(disaster_type, '#808080')
+            urgency_color = URGENCY_COLORS[urgency] if urgency in (1, 2, 3) else URGENCY_COLORS[0]
             
-            marker_color = disaster_colors.get(disaster_type, '#808080')
-            urgency_icons = {1: '⚠️', 2: '🔥', 3: '🚨'}
+            hover_text = render_hover_text(
+                disaster_type=disaster_type.upper(), place=place_text, country=country,
+                urgency=urgency, confidence=confidence, post_time=post_time, author=disaster['author']
+            )
             
-            # GPS-style pin marker
-            gps_pin_html = f'''
-            <div style="position: relative; width: 30px; height: 40px;">
-                <!-- Pin body -->
-                <div style="
-                    position: absolute;
-                    width: 30px;
-                    height: 30px;
-                    background: {marker_color};
-                    border: 3px solid #ffffff;
-                    border-radius: 50% 50% 50% 0;
-                    transform: rotate(-45deg);
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.3);
-                    top: 0;
-                    left: 0;
-                "></div>
-                <!-- Inner icon -->
-                <div style="
-                    position: absolute;
-                    top: 6px;
-                    left: 6px;
-                    width: 18px;
-                    height: 18px;
-                    background: white;
-                    border-radius: 50%;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-size: 10px;
-                    z-index: 10;
-                    transform: rotate(45deg);
-                ">{urgency_icons[urgency]}</div>
-                <!-- Pin tip shadow -->
-                <div style="
-                    position: absolute;
-                    bottom: -2px;
-                    left: 13px;
-                    width: 4px;
-                    height: 4px;
-                    background: rgba(0,0,0,0.2);
-                    border-radius: 50%;
-                    transform: scale(1, 0.5);
-                "></div>
-            </div>
-            '''
+            popup_content = render_popup(
+                place=place_text, type_color=type_color, disaster_type=disaster_type.title(),
+                urgency_color=urgency_color, urgency=urgency, confidence=confidence,
+                region=region.replace('_', ' ').title(),
+                title=title[:80] + ('...' if len(title) > 80 else ''),
+                author=disaster['author'], post_time=post_time, country=country
+            )
             
-            folium.Marker(
+            # Native SVG circles render far lighter than per-marker HTML pins; size = urgency + confidence
+            folium.CircleMarker(
                 location=[lat, lon],
+                radius=4 + urgency * 2 + confidence / 2,
+                color='#ffffff',
+                weight=2,
+                fill=True,
+                fill_color=type_color,
+                fill_opacity=0.85,
                 popup=folium.Popup(popup_content, max_width=400),
-                tooltip=folium.Tooltip(hover_text, style="background-color: rgba(0,0,0,0.8); color: white; font-family: Arial; padding: 10px; border-radius: 8px; font-size: 12px; white-space: pre-line;"),
-                icon=folium.DivIcon(
-                    html=gps_pin_html,
-                    icon_size=(30, 40),
-                    icon_anchor=(15, 40)
-                )
-            ).add_to(world_map)
+                tooltip=folium.Tooltip(hover_text, style="background-color: rgba(0,0,0,0.8); color: white; font-family: Arial; padding: 10px; border-radius: 8px; font-size: 12px; white-space: pre-line;")
+            ).add_to(disaster_layer)
     
     legend_html = '''
     <div style="position: fixed; 
@@ -496,8 +674,12 @@ def create_world_disaster_map():
     
     world_map.get_root().html.add_child(folium.Element(legend_html))
     
-    filename = "disaster_map.html"
     world_map.save(filename)
+    if failed_places:
+        # Don't let a geocoding outage pin this incomplete map until the data changes
+        print(f"⚠️ {len(failed_places)} places could not be geocoded; the map will be rebuilt on the next run")
+    else:
+        save_render(filename, fingerprint, filename)
     
     print(f"✅ World map updated: {filename}")
     print(f"📍 Marked {len(disasters)} individual disasters")
@@ -505,32 +687,18 @@ def create_world_disaster_map():
     return filename
 
 def create_basic_world_map():
-    """Fallback basic world map using matplotlib"""
+    """Fallback basic world map written straight to SVG"""
+    cached, fingerprint = reuse_render('basic_world_map', "Basic world map")
+    if cached:
+        return cached
+    
     disasters = get_last_24_hours_disasters()
     
     if not disasters:
         print("No disaster data available for mapping.")
         return
     
-    # Basic world coordinates
-    region_coords = {
-        'North_America': {'lat': 45.0, 'lon': -100.0},
-        'Asia': {'lat': 30.0, 'lon': 100.0},
-        'Europe': {'lat': 50.0, 'lon': 10.0},
-        'South_America': {'lat': -15.0, 'lon': -60.0},
-        'Africa': {'lat': 0.0, 'lon': 20.0},
-        'Oceania': {'lat': -25.0, 'lon': 140.0}
-    }
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(15, 8))
-    
-    # Simple world outline
-    world_x = [-180, 180, 180, -180, -180]
-    world_y = [-90, -90, 90, 90, -90]
-    ax.plot(world_x, world_y, 'k-', linewidth=2)
-    
-    # Add continent rectangles
+    # Continent rectangles as [[lon1, lon2], [lat1, lat2]]
     continents = {
         'North America': [[-140, -60], [20, 70]],
         'South America': [[-80, -40], [-50, 10]], 
@@ -540,23 +708,31 @@ def create_basic_world_map():
         'Oceania': [[110, 180], [-50, -10]]
     }
     
-    for continent, [[x1, x2], [y1, y2]] in continents.items():
-        ax.add_patch(plt.Rectangle((x1, y1), x2-x1, y2-y1,
-                                 fill=False, edgecolor='gray', linewidth=1))
-        ax.text((x1+x2)/2, (y1+y2)/2, continent,
-               ha='center', va='center', fontsize=10, alpha=0.7)
-    
-    # Plot disasters
     colors = {'fire': 'red', 'flood': 'blue', 'earthquake': 'orange', 
              'storm': 'purple', 'other': 'green'}
     
     regional_data = defaultdict(list)
     for disaster in disasters:
-        regional_data[disaster['region']].append(disaster)
+        regional_data[(disaster['region'] or '').strip().lower()].append(disaster)
+    
+    # The viewBox is in degrees, so SVG y is just the negated latitude
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="-180 -90 360 180" width="1500" height="750" '
+        'font-family="sans-serif">',
+        '<title>World Disaster Map - Last 24 Hours (Size = Number of Disasters, Color = Most Common Type)</title>',
+        '<rect x="-180" y="-90" width="360" height="180" fill="white" stroke="black" stroke-width="0.5"/>',
+        '<text x="0" y="-82" text-anchor="middle" font-size="6" font-weight="bold">World Disaster Map - Last 24 Hours</text>'
+    ]
+    
+    for continent, [[x1, x2], [y1, y2]] in continents.items():
+        parts.append(f'<rect x="{x1}" y="{-y2}" width="{x2 - x1}" height="{y2 - y1}" '
+                     f'fill="none" stroke="gray" stroke-width="0.3"/>')
+        parts.append(f'<text x="{(x1 + x2) / 2}" y="{-(y1 + y2) / 2}" text-anchor="middle" '
+                     f'dominant-baseline="middle" font-size="4" fill-opacity="0.7">{continent}</text>')
     
     for region, disaster_list in regional_data.items():
-        if region in region_coords:
-            coord = region_coords[region]
+        coord = REGION_COORDS.get(region)
+        if coord:
             count = len(disaster_list)
             
             # Get most common disaster type
@@ -564,46 +740,37 @@ def create_basic_world_map():
             most_common = max(set(types), key=types.count)
             color = colors.get(most_common.lower(), 'black')
             
-            # Plot marker
-            size = 100 + (count * 50)
-            ax.scatter(coord['lon'], coord['lat'], c=color, s=size, 
-                      alpha=0.7, edgecolors='black', linewidth=2)
-            
-            # Add count label
-            ax.annotate(f"{count}", (coord['lon'], coord['lat']),
-                       xytext=(0, 0), textcoords='offset points',
-                       ha='center', va='center', fontsize=12, fontweight='bold',
-                       color='white')
-    
-    ax.set_xlim(-180, 180)
-    ax.set_ylim(-90, 90)
-    ax.set_xlabel('Longitude', fontsize=12)
-    ax.set_ylabel('Latitude', fontsize=12)
-    ax.set_title('World Disaster Map - Last 24 Hours\n(Size = Number of Disasters, Color = Most Common Type)', 
-                fontsize=14, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    
-    # Add legend
-    legend_elements = []
-    for disaster_type, color in colors.items():
-        legend_elements.append(plt.scatter([], [], c=color, s=100, 
-                                         label=disaster_type.title(), alpha=0.7))
-    
-    ax.legend(handles=legend_elements, title="Disaster Types", 
-             loc='lower left', bbox_to_anchor=(0.02, 0.02))
+            radius = round((100 + count * 50) ** 0.5 / 3, 2)
+            parts.append(f'<circle cx="{coord["lon"]}" cy="{-coord["lat"]}" r="{radius}" fill="{color}" '
+                         f'fill-opacity="0.7" stroke="black" stroke-width="0.5"/>')
+            parts.append(f'<text x="{coord["lon"]}" y="{-coord["lat"]}" text-anchor="middle" dominant-baseline="middle" '
+                         f'font-size="5" font-weight="bold" fill="white">{count}</text>')
     
-    plt.tight_layout()
+    # Legend
+    parts.append('<text x="-175" y="52" font-size="4" font-weight="bold">Disaster Types</text>')
+    for i, (disaster_type, color) in enumerate(colors.items()):
+        y = 58 + i * 6
+        parts.append(f'<circle cx="-172" cy="{y}" r="2" fill="{color}" fill-opacity="0.7"/>')
+        parts.append(f'<text x="-168" y="{y}" dominant-baseline="middle" font-size="4">{disaster_type.title()}</text>')
+    
+    parts.append('</svg>')
     
     # Save
-    filename = f"basic_world_map_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
-    plt.show()
+    filename = f"basic_world_map_{datetime.now().strftime('%Y%m%d_%H%M%S')}.svg"
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    save_render('basic_world_map', fingerprint, filename)
     
     print(f"✅ Basic world map saved as {filename}")
     return filename
 
 def create_matplotlib_plots():
     """Create basic plots using matplotlib if plotly is not available"""
+    cached, fingerprint = reuse_render('disaster_plots', "Static plots")
+    if cached:
+        show_render(cached)
+        return cached
+    
     disasters = get_last_24_hours_disasters()
     stats = get_disaster_statistics()
     
@@ -611,6 +778,8 @@ def create_matplotlib_plots():
         print("No disaster data available for plotting.")
         return
     
+    import matplotlib.pyplot as plt
+    
     # Create figure with subplots
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
     fig.suptitle('🌍 Disaster Analytics Dashboard - Last 24 Hours', fontsize=16)
@@ -641,8 +810,9 @@ def create_matplotlib_plots():
     ax3.set_ylabel('Count')
     
     # 4. Confidence vs Urgency
-    confidence_levels = [d['confidence_level'] for d in disasters]
-    urgency_nums = [d['urgency_level'] for d in disasters]
+    arrays = get_disaster_arrays()
+    confidence_levels = arrays['confidence_level']
+    urgency_nums = arrays['urgency_level']
     ax4.scatter(confidence_levels, urgency_nums, alpha=0.7, s=100)
     ax4.set_title('Confidence vs Urgency')
     ax4.set_xlabel('Confidence Level')
@@ -654,6 +824,7 @@ def create_matplotlib_plots():
     # Save plot
     filename = f"disaster_plots_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
     plt.savefig(filename, dpi=300, bbox_inches='tight')
+    save_render('disaster_plots', fingerprint, filename)
     plt.show()
     
     print(f"✅ Static plots saved as {filename}")
@@ -679,7 +850,7 @@ def create_regional_analysis_report():
         for disaster in disasters:
             types_in_region[disaster['disaster_type']] += 1
             urgency_level = disaster['urgency_level']
-            urgency_label = {1: 'low', 2: 'moderate', 3: 'high'}.get(urgency_level, 'unknown')
+            urgency_label = URGENCY_LABELS[urgency_level] if urgency_level in (1, 2, 3) else 'unknown'
             urgency_in_region[urgency_label] += 1
             confidence_sum += disaster['confidence_level']
         
@@ -699,10 +870,9 @@ def create_regional_analysis_report():
     print("\n" + "="*80)
 
 if __name__ == "__main__":
+    create_database()
     filename = create_world_disaster_map()
     
     if filename:
-        import webbrowser
-        import os
         file_path = os.path.abspath(filename)
         webbrowser.open(f'file:///{file_path}')